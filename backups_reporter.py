@@ -5,20 +5,60 @@ Backups Reporter - Monitor and report on Borg repositories and S3 buckets
 
 import os
 import sys
+import argparse
 import yaml
 import logging
 import tempfile
 import subprocess
+import threading
+import heapq
+import html
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from pathlib import Path
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from string import Template
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import smtplib
-import requests
-import boto3
-from botocore.exceptions import ClientError
+
+# orjson parses borg's JSON output faster, fall back to the standard library when it isn't installed
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Use the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YamlSafeLoader
+
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+REPORT_ROW_TEMPLATE = Template("""
+                    <tr>
+                        <td class="$source_class">$source</td>
+                        <td>$name</td>
+                        <td class="timestamp">$timestamp</td>
+                        <td class="size">$size</td>
+                        <td>$entry_type</td>
+                    </tr>
+            """)
+
+
+# boto3 and requests are slow to import, so they are only loaded when a source or webhook needs them
+@lru_cache(maxsize=None)
+def _import_boto3():
+    import boto3
+    return boto3
+
+
+@lru_cache(maxsize=None)
+def _import_requests():
+    import requests
+    return requests
 
 
 @dataclass
@@ -33,30 +73,62 @@ class BackupEntry:
 class WebhookNotifier:
     def __init__(self, webhooks: List[str]):
         self.webhooks = webhooks
+        requests = _import_requests()
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': 'BackupsReporter/1.0'})
 
+        retry = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            allowed_methods=frozenset(['POST'])
+        )
+        # Pings are sent concurrently, so keep one pooled connection per webhook
+        adapter = HTTPAdapter(max_retries=retry, pool_maxsize=max(10, len(webhooks)))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        # Resolve each webhook's kind and base URL once rather than on every ping
+        self._endpoints: List[Tuple[str, str, str]] = [(webhook, *self._resolve_endpoint(webhook)) for webhook in webhooks]
+
+    @staticmethod
+    def _resolve_endpoint(webhook: str) -> Tuple[str, str]:
+        if "healthchecks.io" in webhook or webhook.endswith("/start") or webhook.endswith("/fail"):
+            for suffix in ("/start", "/fail"):
+                if webhook.endswith(suffix):
+                    return "healthchecks", webhook[:-len(suffix)]
+            return "healthchecks", webhook
+        return "generic", webhook
+
     def ping(self, status: str = "start", message: str = ""):
-        for webhook in self.webhooks:
-            try:
-                if "healthchecks.io" in webhook or webhook.endswith("/start") or webhook.endswith("/fail"):
-                    if status == "start":
-                        url = webhook if webhook.endswith("/start") else f"{webhook}/start"
-                    elif status == "fail":
-                        url = webhook if webhook.endswith("/fail") else f"{webhook}/fail"
-                    else:
-                        url = webhook.replace("/start", "").replace("/fail", "")
-
-                    response = self.session.post(url, data=message.encode('utf-8'), timeout=10)
-                    response.raise_for_status()
-                else:
-                    payload = {"status": status, "message": message, "timestamp": datetime.now(timezone.utc).isoformat()}
-                    response = self.session.post(webhook, json=payload, timeout=10)
-                    response.raise_for_status()
+        if not self.webhooks:
+            return
+
+        # Notify all webhooks concurrently so a slow endpoint doesn't delay the others
+        with ThreadPoolExecutor(max_workers=len(self.webhooks)) as executor:
+            futures = [executor.submit(self._send, *endpoint, status, message) for endpoint in self._endpoints]
+            for future in futures:
+                future.result()
+
+    def _send(self, webhook: str, kind: str, base_url: str, status: str, message: str):
+        requests = _import_requests()
 
-                logging.info(f"Webhook notification sent successfully to {webhook}")
-            except requests.RequestException as e:
-                logging.error(f"Failed to send webhook notification to {webhook}: {e}")
+        try:
+            if kind == "healthchecks":
+                url = f"{base_url}/{status}" if status in ("start", "fail") else base_url
+                response = self.session.post(url, data=message.encode('utf-8'), timeout=10)
+                response.raise_for_status()
+            else:
+                payload = {"status": status, "message": message, "timestamp": datetime.now(timezone.utc).isoformat()}
+                response = self.session.post(webhook, json=payload, timeout=10)
+                response.raise_for_status()
+
+            logging.info(f"Webhook notification sent successfully to {webhook}")
+        except requests.RequestException as e:
+            logging.error(f"Failed to send webhook notification to {webhook}: {e}")
 
 
 class BorgRepository:
@@ -64,34 +136,44 @@ class BorgRepository:
         self.name = config['name']
         self.repository = config['repository']
         self.passphrase = config.get('passphrase')
-        self.calculate_sizes = config.get('calculate_sizes', True)
+        self.calculate_sizes = config.get('calculate_sizes', False)
+        self.use_mount = config.get('use_mount', False)
+        self.size_scan_workers = config.get('size_scan_workers', 1)
         self.ssh_strict_host_key_checking = config.get('ssh_strict_host_key_checking', False)
         self.ssh_known_hosts_file = config.get('ssh_known_hosts_file')
         self.mount_point = None
 
-    def mount(self) -> bool:
-        try:
-            self.mount_point = tempfile.mkdtemp(prefix=f"borg_{self.name}_")
+        # Build the Borg environment once for all invocations; without overrides the
+        # child processes simply inherit ours and no copy is needed
+        env_overrides = self._build_env_overrides()
+        self._env = {**os.environ, **env_overrides} if env_overrides else None
+
+    def _build_env_overrides(self) -> Dict[str, str]:
+        env = {}
+        if self.passphrase:
+            env['BORG_PASSPHRASE'] = self.passphrase
 
-            env = os.environ.copy()
-            if self.passphrase:
-                env['BORG_PASSPHRASE'] = self.passphrase
+        # Configure SSH options for remote repositories
+        if self.repository.startswith(('ssh://', 'user@')):
+            ssh_options = []
 
-            # Configure SSH options for remote repositories
-            if self.repository.startswith(('ssh://', 'user@')):
-                ssh_options = []
+            if not self.ssh_strict_host_key_checking:
+                ssh_options.extend(['-o', 'StrictHostKeyChecking=no'])
+                ssh_options.extend(['-o', 'UserKnownHostsFile=/dev/null'])
+            elif self.ssh_known_hosts_file:
+                ssh_options.extend(['-o', f'UserKnownHostsFile={self.ssh_known_hosts_file}'])
 
-                if not self.ssh_strict_host_key_checking:
-                    ssh_options.extend(['-o', 'StrictHostKeyChecking=no'])
-                    ssh_options.extend(['-o', 'UserKnownHostsFile=/dev/null'])
-                elif self.ssh_known_hosts_file:
-                    ssh_options.extend(['-o', f'UserKnownHostsFile={self.ssh_known_hosts_file}'])
+            if ssh_options:
+                env['BORG_RSH'] = f"ssh {' '.join(ssh_options)}"
 
-                if ssh_options:
-                    env['BORG_RSH'] = f"ssh {' '.join(ssh_options)}"
+        return env
+
+    def mount(self) -> bool:
+        try:
+            self.mount_point = tempfile.mkdtemp(prefix=f"borg_{self.name}_")
 
             cmd = ['borg', 'mount', self.repository, self.mount_point]
-            result = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=300)
+            result = subprocess.run(cmd, env=self._env, capture_output=True, text=True, timeout=300)
 
             if result.returncode == 0:
                 logging.info(f"Successfully mounted Borg repository {self.name} at {self.mount_point}")
@@ -115,29 +197,37 @@ class BorgRepository:
             except Exception as e:
                 logging.error(f"Error unmounting Borg repository {self.name}: {e}")
 
-    def _calculate_directory_size(self, directory_path: Path) -> int:
+    @staticmethod
+    def _calculate_directory_size(directory_path: str) -> int:
         """Calculate the total size of a directory recursively."""
         total_size = 0
         file_count = 0
 
+        def _iter_file_sizes(path):
+            # os.scandir caches the entry type from readdir, so each file only costs one stat()
+            try:
+                with os.scandir(path) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                yield from _iter_file_sizes(entry.path)
+                            else:
+                                yield entry.stat(follow_symlinks=False).st_size
+                        except OSError:
+                            # Skip entries that can't be accessed
+                            continue
+            except OSError:
+                # Skip directories that can't be listed
+                return
+
         try:
-            # Use os.walk for better performance on large directories
-            import os
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    try:
-                        file_path = os.path.join(root, file)
-                        file_size = os.path.getsize(file_path)
-                        total_size += file_size
-                        file_count += 1
-
-                        # Log progress every 10000 files for very large archives
-                        if file_count % 10000 == 0:
-                            logging.info(f"Processed {file_count:,} files, current size: {total_size:,} bytes")
-
-                    except (OSError, PermissionError):
-                        # Skip files that can't be accessed
-                        continue
+            for file_size in _iter_file_sizes(directory_path):
+                total_size += file_size
+                file_count += 1
+
+                # Log progress every 10000 files for very large archives
+                if file_count % 10000 == 0:
+                    logging.info(f"Processed {file_count:,} files, current size: {total_size:,} bytes")
 
             logging.info(f"Archive scan complete: {file_count:,} files, total size: {total_size:,} bytes")
 
@@ -151,32 +241,43 @@ class BorgRepository:
             return []
 
         entries = []
+        archive_paths = {}
         try:
-            # First pass: collect all archives with basic info (no size calculation)
-            for item in Path(self.mount_point).iterdir():
-                if item.is_dir():
-                    stat = item.stat()
-                    entries.append(BackupEntry(
-                        source=f"borg:{self.name}",
-                        name=item.name,
-                        timestamp=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
-                        size=None,  # Will calculate later only for limited entries
-                        type="borg_archive"
-                    ))
-
-            # Sort by timestamp and limit to most recent
-            entries.sort(key=lambda x: x.timestamp, reverse=True)
-            limited_entries = entries[:limit]
-
-            # Second pass: calculate sizes only for the limited entries
-            if self.calculate_sizes:
+            # First pass: collect all archives with basic info (no size calculation),
+            # reusing the type and stat information cached by os.scandir
+            with os.scandir(self.mount_point) as it:
+                for item in it:
+                    if item.is_dir(follow_symlinks=False):
+                        stat = item.stat(follow_symlinks=False)
+                        archive_paths[item.name] = item.path
+                        entries.append(BackupEntry(
+                            source=f"borg:{self.name}",
+                            name=item.name,
+                            timestamp=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                            size=None,  # Will calculate later only for limited entries
+                            type="borg_archive"
+                        ))
+
+            # Keep only the most recent archives
+            limited_entries = heapq.nlargest(limit, entries, key=lambda x: x.timestamp)
+
+            # Second pass: calculate sizes only for the limited entries, one archive per thread
+            # since the scan is bound by FUSE round-trips rather than CPU. With warm caches the
+            # per-file interpreter overhead dominates instead, which processes can spread over cores
+            if self.calculate_sizes and limited_entries:
                 logging.info(f"Calculating sizes for {len(limited_entries)} most recent archives out of {len(entries)} total")
-                for entry in limited_entries:
-                    # Find the corresponding directory
-                    archive_path = Path(self.mount_point) / entry.name
-                    if archive_path.is_dir():
+                if self.size_scan_workers > 1:
+                    executor = ProcessPoolExecutor(max_workers=min(self.size_scan_workers, len(limited_entries)))
+                else:
+                    executor = ThreadPoolExecutor(max_workers=min(8, len(limited_entries)))
+                with executor:
+                    futures = []
+                    for entry in limited_entries:
                         logging.info(f"Calculating size for Borg archive: {entry.name}")
-                        entry.size = self._calculate_directory_size(archive_path)
+                        futures.append((entry, executor.submit(self._calculate_directory_size, archive_paths[entry.name])))
+
+                    for entry, future in futures:
+                        entry.size = future.result()
                         logging.info(f"Archive {entry.name} size: {entry.size} bytes")
 
             return limited_entries
@@ -184,6 +285,71 @@ class BorgRepository:
             logging.error(f"Error listing archives from Borg repository {self.name}: {e}")
             return []
 
+    def list_archives_via_cli(self, limit: int = 10) -> List[BackupEntry]:
+        """List the most recent archives from the repository index, without mounting it."""
+        # `borg info` also reports the archive sizes, `borg list` is cheaper when they aren't needed
+        command = 'info' if self.calculate_sizes else 'list'
+        cmd = ['borg', command, '--json', '--last', str(limit), self.repository]
+
+        try:
+            result = subprocess.run(cmd, env=self._env, capture_output=True, text=True, timeout=300)
+            if result.returncode != 0:
+                logging.error(f"Failed to list archives from Borg repository {self.name}: {result.stderr}")
+                return []
+
+            entries = []
+            for archive in json_loads(result.stdout)['archives']:
+                stats = archive.get('stats', {})
+                entries.append(BackupEntry(
+                    source=f"borg:{self.name}",
+                    name=archive['name'],
+                    timestamp=self._parse_timestamp(archive['start']),
+                    size=stats.get('original_size'),
+                    type="borg_archive"
+                ))
+
+            return heapq.nlargest(limit, entries, key=lambda x: x.timestamp)
+        except subprocess.TimeoutExpired:
+            logging.error(f"Timeout while listing archives from Borg repository {self.name}")
+            return []
+        except Exception as e:
+            logging.error(f"Error listing archives from Borg repository {self.name}: {e}")
+            return []
+
+    @staticmethod
+    def _parse_timestamp(value: str) -> datetime:
+        # Borg 1.x reports local time without an offset, newer versions include one
+        return datetime.fromisoformat(value).astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def _get_s3_client(region: str, endpoint_url: Optional[str], access_key: Optional[str], secret_key: Optional[str]):
+    """Create an S3 client, shared by all buckets using the same region, endpoint and credentials."""
+    session_kwargs = {}
+    if access_key and secret_key:
+        session_kwargs.update({
+            'aws_access_key_id': access_key,
+            'aws_secret_access_key': secret_key
+        })
+
+    boto3 = _import_boto3()
+    from botocore.config import Config as BotocoreConfig
+
+    session = boto3.Session(**session_kwargs)
+
+    client_kwargs = {
+        'region_name': region,
+        'config': BotocoreConfig(
+            max_pool_connections=32,
+            retries={'mode': 'standard', 'max_attempts': 3},
+            tcp_keepalive=True
+        )
+    }
+    if endpoint_url:
+        client_kwargs['endpoint_url'] = endpoint_url
+
+    return session.client('s3', **client_kwargs)
+
 
 class S3Bucket:
     def __init__(self, config: Dict[str, Any]):
@@ -196,41 +362,30 @@ class S3Bucket:
         self.endpoint_url = config.get('endpoint_url')
 
     def list_objects(self, limit: int = 10) -> List[BackupEntry]:
-        try:
-            session_kwargs = {}
-            if self.access_key and self.secret_key:
-                session_kwargs.update({
-                    'aws_access_key_id': self.access_key,
-                    'aws_secret_access_key': self.secret_key
-                })
+        from botocore.exceptions import ClientError
 
-            session = boto3.Session(**session_kwargs)
-
-            client_kwargs = {'region_name': self.region}
-            if self.endpoint_url:
-                client_kwargs['endpoint_url'] = self.endpoint_url
-
-            s3 = session.client('s3', **client_kwargs)
+        try:
+            s3 = _get_s3_client(self.region, self.endpoint_url, self.access_key, self.secret_key)
 
             paginator = s3.get_paginator('list_objects_v2')
             page_kwargs = {'Bucket': self.bucket}
             if self.prefix:
                 page_kwargs['Prefix'] = self.prefix
 
-            entries = []
-            for page in paginator.paginate(**page_kwargs):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        entries.append(BackupEntry(
+            def iter_entries():
+                for page in paginator.paginate(**page_kwargs, PaginationConfig={'PageSize': 1000}):
+                    for obj in page.get('Contents', []):
+                        yield BackupEntry(
                             source=f"s3:{self.name}",
                             name=obj['Key'],
                             timestamp=obj['LastModified'],
                             size=obj['Size'],
                             type="s3_object"
-                        ))
+                        )
 
-            entries.sort(key=lambda x: x.timestamp, reverse=True)
-            return entries[:limit]
+            # Keys are listed in lexicographic order, so every page has to be read,
+            # but only the most recent entries are kept in memory
+            return heapq.nlargest(limit, iter_entries(), key=lambda x: x.timestamp)
         except ClientError as e:
             logging.error(f"Error listing objects from S3 bucket {self.name}: {e}")
             return []
@@ -276,13 +431,11 @@ class EmailReporter:
         def format_size(size: Optional[int]) -> str:
             if size is None:
                 return "N/A"
-            for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                if size < 1024.0:
-                    return f"{size:.1f} {unit}"
-                size /= 1024.0
-            return f"{size:.1f} PB"
+            # Each unit is 2**10 times the previous one, so the bit length gives the unit directly
+            index = 0 if size <= 0 else min((size.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+            return f"{size / (1 << (index * 10)):.1f} {SIZE_UNITS[index]}"
 
-        html = """
+        header = """
         <!DOCTYPE html>
         <html>
         <head>
@@ -322,38 +475,33 @@ class EmailReporter:
             total_entries=len(entries)
         )
 
-        for entry in entries:
-            source_class = 'borg' if entry.source.startswith('borg:') else 's3'
-            html += """
-                    <tr>
-                        <td class="{source_class}">{source}</td>
-                        <td>{name}</td>
-                        <td class="timestamp">{timestamp}</td>
-                        <td class="size">{size}</td>
-                        <td>{entry_type}</td>
-                    </tr>
-            """.format(
-                source_class=source_class,
-                source=entry.source,
-                name=entry.name,
+        rows = [
+            REPORT_ROW_TEMPLATE.substitute(
+                source_class='borg' if entry.source.startswith('borg:') else 's3',
+                source=html.escape(entry.source),
+                name=html.escape(entry.name),
                 timestamp=entry.timestamp.strftime('%Y-%m-%d %H:%M:%S'),
                 size=format_size(entry.size),
-                entry_type=entry.type
+                entry_type=html.escape(entry.type)
             )
+            for entry in entries
+        ]
 
-        html += """
+        footer = """
                 </tbody>
             </table>
         </body>
         </html>
         """
-        return html
+        return "".join([header, *rows, footer])
 
 
 class BackupsReporter:
-    def __init__(self, config_path: str):
+    def __init__(self, config_path: str, with_sizes: bool = False):
         with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)
+            self.config = yaml.load(f, Loader=YamlSafeLoader)
+
+        self.with_sizes = with_sizes
 
         self.setup_logging()
         self.webhook_notifier = None
@@ -367,44 +515,70 @@ class BackupsReporter:
             format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
 
+    def _process_borg_repository(self, repo_config: Dict[str, Any], limit: int):
+        repo = BorgRepository(repo_config)
+        if self.with_sizes:
+            repo.calculate_sizes = True
+        # Sizes are only rendered in the email report, don't compute them if there is none
+        if 'email' not in self.config:
+            repo.calculate_sizes = False
+
+        if not repo.use_mount:
+            return None, repo.list_archives_via_cli(limit)
+        if not repo.mount():
+            return None, []
+        return repo, repo.list_archives(limit)
+
+    def _process_s3_bucket(self, bucket_config: Dict[str, Any], limit: int):
+        bucket = S3Bucket(bucket_config)
+        return None, bucket.list_objects(limit)
+
     def run(self):
+        # Send the start notification in the background while the sources are listed,
+        # it is awaited before the final status so the webhooks still see them in order
+        start_ping = None
         if self.webhook_notifier:
-            self.webhook_notifier.ping("start", "Backups report generation started")
+            start_ping = threading.Thread(target=self.webhook_notifier.ping, args=("start", "Backups report generation started"))
+            start_ping.start()
 
         try:
             entries = []
             limit_per_source = self.config.get('entries_per_source', 10)
 
-            # Process Borg repositories
+            # Process Borg repositories and S3 buckets concurrently, as each one is bound by network/FUSE I/O
             borg_repos = []
-            for repo_config in self.config.get('borg_repositories', []):
-                repo = BorgRepository(repo_config)
-                if repo.mount():
-                    borg_repos.append(repo)
-                    entries.extend(repo.list_archives(limit_per_source))
-
-            # Process S3 buckets
-            for bucket_config in self.config.get('s3_buckets', []):
-                bucket = S3Bucket(bucket_config)
-                entries.extend(bucket.list_objects(limit_per_source))
-
-            # Sort all entries by timestamp
-            entries.sort(key=lambda x: x.timestamp, reverse=True)
-
-            # Limit total entries
+            futures = []
+            borg_configs = self.config.get('borg_repositories', [])
+            s3_configs = self.config.get('s3_buckets', [])
+            if borg_configs or s3_configs:
+                with ThreadPoolExecutor(max_workers=len(borg_configs) + len(s3_configs)) as executor:
+                    for repo_config in borg_configs:
+                        futures.append(executor.submit(self._process_borg_repository, repo_config, limit_per_source))
+                    for bucket_config in s3_configs:
+                        futures.append(executor.submit(self._process_s3_bucket, bucket_config, limit_per_source))
+
+                    for future in as_completed(futures):
+                        repo, source_entries = future.result()
+                        if repo:
+                            borg_repos.append(repo)
+                        entries.extend(source_entries)
+
+            # Keep the most recent entries across all sources, sorted by timestamp
             max_entries = self.config.get('max_total_entries', 100)
-            entries = entries[:max_entries]
+            entries = heapq.nlargest(max_entries, entries, key=lambda x: x.timestamp)
 
             # Send email report
             if 'email' in self.config:
                 reporter = EmailReporter(self.config['email'])
                 reporter.send_report(entries)
 
-            # Cleanup Borg mounts
-            for repo in borg_repos:
-                repo.unmount()
+            # Cleanup Borg mounts concurrently, so teardown takes as long as the slowest unmount
+            if borg_repos:
+                with ThreadPoolExecutor(max_workers=len(borg_repos)) as executor:
+                    list(executor.map(lambda repo: repo.unmount(), borg_repos))
 
             if self.webhook_notifier:
+                start_ping.join()
                 self.webhook_notifier.ping("success", f"Backups report generated successfully with {len(entries)} entries")
 
             logging.info(f"Backups report generation completed successfully with {len(entries)} entries")
@@ -412,6 +586,7 @@ class BackupsReporter:
         except Exception as e:
             logging.error(f"Error during backups report generation: {e}")
             if self.webhook_notifier:
+                start_ping.join()
                 self.webhook_notifier.ping("fail", f"Backups report generation failed: {str(e)}")
             raise
 
@@ -420,12 +595,14 @@ def main():
     # Default config file path
     default_config = "config.yaml"
 
-    if len(sys.argv) > 2:
-        print("Usage: backups_reporter.py [config_file]")
-        print("If no config file is specified, 'config.yaml' will be used.")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Monitor and report on Borg repositories and S3 buckets")
+    parser.add_argument('config_file', nargs='?', default=default_config,
+                        help=f"Path to the configuration file (default: {default_config})")
+    parser.add_argument('--with-sizes', action='store_true',
+                        help="Calculate Borg archive sizes for all repositories, overriding calculate_sizes")
+    args = parser.parse_args()
 
-    config_file = sys.argv[1] if len(sys.argv) == 2 else default_config
+    config_file = args.config_file
 
     if not os.path.exists(config_file):
         print(f"Config file not found: {config_file}")
@@ -434,7 +611,7 @@ def main():
         sys.exit(1)
 
     try:
-        reporter = BackupsReporter(config_file)
+        reporter = BackupsReporter(config_file, with_sizes=args.with_sizes)
         reporter.run()
     except Exception as e:
         logging.error(f"Application failed: {e}")